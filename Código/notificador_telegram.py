@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Notificador Telegram da ETL: envio HTTP com retry e uma thread que despacha a fila em segundo plano.
+# Fica fora do script principal para poder ser importado (e testado contra um stub HTTP local) sem rodar a ETL.
+import os, time, requests, logging, io, queue, threading, gzip, atexit
+
+log = logging.getLogger("safe_road_etl")
+
+# ✅ Recomendo manter token/chatid em variáveis de ambiente
+TG_TOKEN  = os.getenv("TG_TOKEN",  "Seu Toker Aqui")
+TG_CHATID = os.getenv("TG_CHATID", "Seu chat id aqui")
+TG_API    = os.getenv("TG_API", "https://api.telegram.org")   # em testes, aponte para um stub HTTP local
+TG_TIMEOUT = 15
+TG_FILA_MAX = 50
+TG_PRAZO_ENCERRAMENTO = float(os.getenv("TG_PRAZO_ENCERRAMENTO", "10"))  # s máximos de espera no fim do processo
+TG_ANEXO_MAX = int(os.getenv("TG_ANEXO_MAX", str(512*1024)))             # bytes de log por anexo (antes do gzip)
+
+def tg_enabled():
+    return TG_TOKEN and TG_CHATID and "COLOQUE_SEU_" not in TG_TOKEN and "COLOQUE_SEU_" not in TG_CHATID
+
+_tg_prazo = None   # instante (time.monotonic) limite, definido no encerramento
+
+def _tg_timeout_restante():
+    if _tg_prazo is None:
+        return TG_TIMEOUT
+    resto = _tg_prazo - time.monotonic()
+    return min(TG_TIMEOUT, resto) if resto > 0.1 else None
+
+def _tg_post(method, data=None, files=None, retries=2, backoff=1.6):
+    if not tg_enabled():
+        return {"ok": False, "reason": "telegram_not_configured"}
+    data = data or {}
+    for i in range(retries + 1):
+        timeout = _tg_timeout_restante()
+        if timeout is None:
+            return {"ok": False, "reason": "deadline"}
+        for _, fobj in (files or {}).values():
+            fobj.seek(0)   # nova tentativa reenvia o arquivo desde o início
+        try:
+            r = requests.post(f"{TG_API.rstrip('/')}/bot{TG_TOKEN}/{method}", data=data, files=files, timeout=timeout)
+            try:
+                return r.json()
+            except Exception:
+                return {"ok": False, "http": r.status_code, "text": r.text[:300]}
+        except Exception as e:
+            restante = _tg_timeout_restante()
+            if i == retries or restante is None or restante <= backoff ** i:
+                return {"ok": False, "error": str(e)}
+            time.sleep(backoff ** i)
+
+def tg_send_message(text, parse_mode=None, disable_web_page_preview=True):
+    data = {"chat_id": str(TG_CHATID), "text": text}
+    if parse_mode:
+        data["parse_mode"] = parse_mode
+    if disable_web_page_preview:
+        data["disable_web_page_preview"] = True
+    return _tg_post("sendMessage", data)
+
+def tg_send_document_bytes(filename, content_bytes, caption=None):
+    files = {"document": (filename, io.BytesIO(content_bytes))}
+    data  = {"chat_id": str(TG_CHATID)}
+    if caption:
+        data["caption"] = caption[:1024]
+    return _tg_post("sendDocument", data=data, files=files)
+
+# ---- envio em segundo plano: a ETL só enfileira, uma thread despacha ----
+_tg_fila = queue.Queue(maxsize=TG_FILA_MAX)
+_tg_thread = None
+_TG_FIM = object()
+
+def tg_enfileirar(tipo, **kw):
+    # nunca bloqueia a ETL: com a fila cheia a notificação é descartada
+    global _tg_thread
+    if not tg_enabled():
+        return False
+    if _tg_thread is None:
+        _tg_thread = threading.Thread(target=_tg_worker, name="tg-notificador", daemon=True)
+        _tg_thread.start()
+    try:
+        _tg_fila.put_nowait((tipo, kw))
+        return True
+    except queue.Full:
+        log.warning("Fila do Telegram cheia: notificação descartada.")
+        return False
+
+def _tg_coalescer(itens):
+    # mensagens pendentes viram uma só (limite de 4096 caracteres); de anexos com o mesmo nome fica o último
+    envios, docs, atual = [], {}, None
+    for tipo, kw in itens:
+        if tipo == "documento":
+            docs[kw["filename"]] = kw
+        elif (atual and atual.get("parse_mode") == kw.get("parse_mode")
+              and len(atual["text"]) + len(kw["text"]) + 2 <= 4096):
+            atual["text"] += "\n\n" + kw["text"]
+        else:
+            atual = dict(kw); envios.append(("mensagem", atual))
+    return envios + [("documento", d) for d in docs.values()]
+
+def _tg_worker():
+    fim = False
+    while not fim:
+        itens = [_tg_fila.get()]
+        while True:
+            try:
+                itens.append(_tg_fila.get_nowait())
+            except queue.Empty:
+                break
+        fim = any(i is _TG_FIM for i in itens)
+        for tipo, kw in _tg_coalescer([i for i in itens if i is not _TG_FIM]):
+            try:
+                if tipo == "mensagem":
+                    r = tg_send_message(**kw)
+                else:
+                    r = tg_send_document_bytes(kw["filename"], gzip.compress(kw["conteudo"]), caption=kw.get("caption"))
+                if not r.get("ok"):
+                    log.warning(f"Telegram: falha ao enviar {tipo}: {r}")
+            except Exception as e:
+                log.warning(f"Telegram: erro ao enviar {tipo}: {e}")
+
+def tg_encerrar(prazo=None):
+    # fim do processo: espera no máximo `prazo` segundos pelas notificações pendentes
+    global _tg_prazo
+    if _tg_thread is None or not _tg_thread.is_alive() or _tg_prazo is not None:
+        return
+    _tg_prazo = time.monotonic() + (TG_PRAZO_ENCERRAMENTO if prazo is None else prazo)
+    try:
+        _tg_fila.put(_TG_FIM, timeout=max(0.0, _tg_prazo - time.monotonic()))
+    except queue.Full:
+        pass
+    _tg_thread.join(max(0.0, _tg_prazo - time.monotonic()))
+    if _tg_thread.is_alive():
+        log.warning("Prazo de encerramento do Telegram esgotado: notificações pendentes descartadas.")
+
+atexit.register(tg_encerrar)
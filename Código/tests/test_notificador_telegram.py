@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Notificador Telegram contra um stub HTTP local: coalescência da fila, anexo gzip e prazo de encerramento.
+import os, sys, gzip, json, time, threading, importlib, unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import notificador_telegram
+
+
+class StubTelegram(BaseHTTPRequestHandler):
+    # registra cada chamada da Bot API; `liberar` segura as respostas enquanto não estiver setado
+    chamadas = []
+    liberar = threading.Event()
+    segurar_ate = 30.0
+
+    def do_POST(self):
+        corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        metodo = self.path.rsplit("/", 1)[-1]
+        if self.headers.get("Content-Type", "").startswith("multipart/"):
+            dados = {"multipart": corpo}
+        else:
+            dados = {k: v[0] for k, v in parse_qs(corpo.decode("utf-8")).items()}
+        type(self).chamadas.append((metodo, dados))
+        type(self).liberar.wait(self.segurar_ate)
+        resposta = json.dumps({"ok": True}).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(resposta)))
+            self.end_headers()
+            self.wfile.write(resposta)
+        except OSError:
+            pass   # cliente já desistiu (prazo esgotado)
+
+    def log_message(self, *args):
+        pass
+
+
+class NotificadorTelegramTest(unittest.TestCase):
+    def setUp(self):
+        StubTelegram.chamadas = []
+        StubTelegram.liberar = threading.Event()
+        self.srv = ThreadingHTTPServer(("127.0.0.1", 0), StubTelegram)
+        self.srv.daemon_threads = True
+        threading.Thread(target=self.srv.serve_forever, daemon=True).start()
+        # estado novo a cada teste (fila, thread e prazo são globais do módulo)
+        self.tg = importlib.reload(notificador_telegram)
+        self.tg.TG_API = f"http://127.0.0.1:{self.srv.server_port}"
+        self.tg.TG_TOKEN, self.tg.TG_CHATID = "teste", "42"
+
+    def tearDown(self):
+        StubTelegram.liberar.set()
+        self.srv.shutdown(); self.srv.server_close()
+
+    def esperar_chamadas(self, n, prazo=5.0):
+        limite = time.monotonic() + prazo
+        while len(StubTelegram.chamadas) < n and time.monotonic() < limite:
+            time.sleep(0.01)
+        self.assertGreaterEqual(len(StubTelegram.chamadas), n)
+
+    def test_coalesce_pendentes_e_compacta_anexo(self):
+        self.tg.tg_enfileirar("mensagem", text="m1", parse_mode="Markdown")
+        self.esperar_chamadas(1)   # worker preso na 1ª resposta: o resto acumula na fila
+        for t in ("m2", "m3", "m4"):
+            self.tg.tg_enfileirar("mensagem", text=t, parse_mode="Markdown")
+        self.tg.tg_enfileirar("documento", filename="etl_run.log.gz", conteudo=b"antigo", caption="log")
+        self.tg.tg_enfileirar("documento", filename="etl_run.log.gz", conteudo=b"linha\n" * 1000, caption="log")
+        StubTelegram.liberar.set()
+        self.tg.tg_encerrar(prazo=5)
+
+        self.assertFalse(self.tg._tg_thread.is_alive())
+        metodos = [m for m, _ in StubTelegram.chamadas]
+        self.assertEqual(metodos, ["sendMessage", "sendMessage", "sendDocument"])
+        self.assertEqual(StubTelegram.chamadas[0][1]["text"], "m1")
+        self.assertEqual(StubTelegram.chamadas[1][1]["text"], "m2\n\nm3\n\nm4")
+        self.assertEqual(StubTelegram.chamadas[1][1]["parse_mode"], "Markdown")
+        # do mesmo anexo fica só o snapshot mais novo, compactado
+        corpo = StubTelegram.chamadas[2][1]["multipart"]
+        gz = corpo[corpo.index(b"\x1f\x8b"):]
+        self.assertEqual(gzip.decompress(gz[:gz.rindex(b"\r\n--")]), b"linha\n" * 1000)
+
+    def test_coalescer_respeita_limite_e_parse_mode(self):
+        envios = self.tg._tg_coalescer([
+            ("mensagem", {"text": "a" * 3000, "parse_mode": "Markdown"}),
+            ("mensagem", {"text": "b" * 2000, "parse_mode": "Markdown"}),
+            ("mensagem", {"text": "c", "parse_mode": None}),
+        ])
+        self.assertEqual([len(kw["text"]) for _, kw in envios], [3000, 2000, 1])
+
+    def test_encerramento_respeita_prazo(self):
+        StubTelegram.segurar_ate = 10.0   # stub não responde dentro do prazo
+        try:
+            self.tg.tg_enfileirar("mensagem", text="pendente")
+            self.esperar_chamadas(1)
+            t0 = time.monotonic()
+            with self.assertLogs("safe_road_etl", level="WARNING"):
+                self.tg.tg_encerrar(prazo=1.0)
+            self.assertLess(time.monotonic() - t0, 2.0)
+        finally:
+            StubTelegram.segurar_ate = 30.0
+
+
+if __name__ == "__main__":
+    unittest.main()